@@ -2,131 +2,673 @@
 """
 Product Search Console Application
 
-This application uses OpenAI's function calling to filter products
-based on natural language user preferences.
+This application uses OpenAI's function calling to extract search criteria
+from natural language user preferences and filters the products locally.
 """
 
+import functools
 import json
 import os
+import re
+import selectors
+import string
 import sys
-from typing import List, Dict, Any
+import threading
+import time
+from typing import Callable, List, Dict, Any, Iterable, Iterator, Optional, Tuple
+import httpx
+import numpy as np
 from openai import OpenAI
 from dotenv import load_dotenv
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import h2  # httpx needs it for HTTP/2
+except ImportError:
+    h2 = None
+
 
 # Load environment variables
 load_dotenv()
 
+# The only product fields the application uses; anything else is dropped on load
+PRODUCT_FIELDS = ("name", "category", "price", "rating", "in_stock")
+
+CATEGORIES = ("Electronics", "Fitness", "Kitchen", "Books", "Clothing")
+
+# Queries whose embeddings are at least this similar share extracted criteria
+EMBEDDING_MODEL = "text-embedding-3-small"
+SEMANTIC_CACHE_THRESHOLD = 0.93
+
+# The compiled keyword scan only pays off for large catalogs; below this
+# size np.char.find is fast and avoids numba's compile on the first query
+NUMBA_MIN_PRODUCTS = 10_000
+
+# Queries arriving within this window are sent to OpenAI in one request
+BATCH_WINDOW_SECONDS = 0.25
+BATCH_MAX_QUERIES = 8
+
+# Strict mode requires every property to be listed in "required", so
+# optional criteria are nullable and null means "not specified"
+FILTER_FUNCTION = {
+    "name": "filter_products",
+    "description": "Filter products by the criteria extracted from the user's query",
+    "strict": True,
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "category": {
+                "type": ["string", "null"],
+                "enum": [*CATEGORIES, None],
+                "description": "Product category"
+            },
+            "min_price": {
+                "type": ["number", "null"],
+                "description": "Minimum price in USD"
+            },
+            "max_price": {
+                "type": ["number", "null"],
+                "description": "Maximum price in USD"
+            },
+            "min_rating": {
+                "type": ["number", "null"],
+                "description": "Minimum rating from 0.0 to 5.0"
+            },
+            "in_stock_only": {
+                "type": "boolean",
+                "description": "Whether to return only products that are in stock"
+            },
+            "product_keywords": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Keywords to match in product names, empty if none"
+            }
+        },
+        "required": ["category", "min_price", "max_price", "min_rating", "in_stock_only", "product_keywords"],
+        "additionalProperties": False
+    }
+}
+
+FILTER_BATCH_FUNCTION = {
+    "name": "filter_products_batch",
+    "description": "Filter products for several queries at once, one search per query in the given order",
+    "strict": True,
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "searches": {
+                "type": "array",
+                "items": FILTER_FUNCTION["parameters"]
+            }
+        },
+        "required": ["searches"],
+        "additionalProperties": False
+    }
+}
+
+SYSTEM_INSTRUCTIONS = """You are a product search assistant. Extract the search criteria from the user's natural language query and pass them to the filter_products function.
+
+INSTRUCTIONS:
+1. Analyze the user's natural language query to understand their requirements
+2. Extract only the criteria the user actually mentioned:
+   - Category (Electronics, Fitness, Kitchen, Books, Clothing)
+   - Price constraints (e.g., "under $100" = max_price 100, "between $50-$200" = min_price 50 and max_price 200)
+   - Rating requirements (e.g., "great rating" = 4.5+, "good rating" = 4.0+)
+   - Stock availability ("in stock" = in_stock_only: true)
+   - Keywords (words to match in product names)
+3. Always use the filter_products function to return the criteria
+
+EXAMPLES:
+- "smartphone under $800" → product_keywords ["smartphone"] AND max_price 800
+- "fitness equipment with great ratings" → category "Fitness" AND min_rating 4.5
+- "kitchen appliances under $100 in stock" → category "Kitchen" AND max_price 100 AND in_stock_only true
+"""
+
+# Patterns for parse_query_locally; each match is removed from the query
+# before checking that nothing meaningful is left over
+CATEGORY_BY_NAME = {name.lower(): name for name in CATEGORIES}
+PRICE_NUMBER = r"\$?\s*(\d+(?:\.\d+)?)"
+LOCAL_PATTERNS = [
+    (re.compile(r"\bbetween\s+" + PRICE_NUMBER + r"\s*(?:and|-|to)\s*" + PRICE_NUMBER),
+     lambda m: {"min_price": float(m.group(1)), "max_price": float(m.group(2))}),
+    (re.compile(r"(?:\b(?:under|below|less than|cheaper than|up to)\b|<)\s*" + PRICE_NUMBER),
+     lambda m: {"max_price": float(m.group(1))}),
+    (re.compile(r"(?:\b(?:over|above|more than)\b|>)\s*" + PRICE_NUMBER),
+     lambda m: {"min_price": float(m.group(1))}),
+    (re.compile(r"\bin[- ]stock\b"),
+     lambda m: {"in_stock_only": True}),
+    (re.compile(r"\b(?:great|excellent|top)(?:[- ]rated|\s+ratings?)\b"),
+     lambda m: {"min_rating": 4.5}),
+    (re.compile(r"\bgood(?:[- ]rated|\s+ratings?)\b"),
+     lambda m: {"min_rating": 4.0}),
+    (re.compile(r"\b(" + "|".join(CATEGORY_BY_NAME) + r")\b"),
+     lambda m: {"category": CATEGORY_BY_NAME[m.group(1)]}),
+]
+LOCAL_STOPWORDS = frozenset("""
+    a an and any are at cost costs costing dollars find for get give i i'm im in is it items
+    looking me my need of on or please price priced products search show some something stuff
+    that the them they to want with would like equipment appliances gear things
+""".split())
+
+# Numbers in a query (prices, ratings); semantic cache hits must agree on them
+QUERY_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError) if ijson else (json.JSONDecodeError,)
+
+
+def normalize_keywords(keywords: Iterable[str]) -> Tuple[str, ...]:
+    """
+    Reduce keywords to a canonical sorted tuple of distinct phrases.
+    
+    Each keyword stays one phrase to match as a whole; it is lowercased,
+    whitespace-collapsed, stripped of surrounding punctuation and of a
+    plural "s", so "Smartphones" and "smartphone" cost a single scan
+    (the singular is a substring of the plural name either way).
+    """
+    phrases = set()
+    for keyword in keywords:
+        phrase = " ".join(keyword.lower().split()).strip(string.punctuation)
+        if len(phrase) > 3 and phrase.endswith("s") and not phrase.endswith("ss"):
+            phrase = phrase[:-1].rstrip(string.punctuation)
+        if phrase:
+            phrases.add(phrase)
+    return tuple(sorted(phrases))
+
+
+def query_numbers(query: str) -> Tuple[float, ...]:
+    """Return the numbers in a query, in order ("$1,000" is 1000.0)."""
+    return tuple(float(number) for number in QUERY_NUMBER.findall(query.replace(",", "")))
+
+
+def parse_query_locally(user_query: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse simple queries ("kitchen appliances under $100 in stock") without
+    the LLM.
+    
+    Returns criteria only if at least one pattern matched and the rest of
+    the query is made of stopwords; anything else (e.g. product names to
+    match as keywords) returns None so the query goes to OpenAI.
+    """
+    text = user_query.lower()
+    criteria = {}
+    for pattern, extract in LOCAL_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            criteria.update(extract(match))
+            text = text[:match.start()] + " " + text[match.end():]
+    
+    if not criteria:
+        return None
+    leftover = re.findall(r"[a-z0-9']+", text)
+    if any(word not in LOCAL_STOPWORDS for word in leftover):
+        return None
+    return criteria
+
+
+@functools.lru_cache(maxsize=None)
+def load_keyword_kernel() -> Optional[Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray]]:
+    """
+    Compile the numba keyword scan on first use, or return None if numba
+    is not installed (it is an optional dependency).
+    """
+    try:
+        import numba
+    except ImportError:
+        return None
+    
+    @numba.njit(parallel=True, cache=True)
+    def find_keyword(name_bytes: np.ndarray, name_offsets: np.ndarray, keyword: np.ndarray) -> np.ndarray:
+        """
+        Compiled substring scan: mark every name containing the keyword.
+        
+        Name i occupies name_bytes[name_offsets[i]:name_offsets[i + 1] - 1]
+        (a NUL separator follows each name).
+        """
+        count = len(name_offsets) - 1
+        length = len(keyword)
+        mask = np.zeros(count, dtype=np.bool_)
+        for i in numba.prange(count):
+            end = name_offsets[i + 1] - 1
+            for start in range(name_offsets[i], end - length + 1):
+                found = True
+                for k in range(length):
+                    if name_bytes[start + k] != keyword[k]:
+                        found = False
+                        break
+                if found:
+                    mask[i] = True
+                    break
+        return mask
+    
+    return find_keyword
+
+
+def iter_json_objects(chunks: Iterable[str], depth: int) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parse streamed JSON text and yield every object nested at
+    the given brace depth as soon as its closing brace arrives.
+    """
+    level = 0
+    in_string = False
+    escaped = False
+    current = None
+    for chunk in chunks:
+        for char in chunk:
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == "{":
+                level += 1
+                if level == depth:
+                    current = []
+            elif char == "}":
+                level -= 1
+                if level == depth - 1 and current is not None:
+                    current.append(char)
+                    yield json.loads("".join(current))
+                    current = None
+                    continue
+            if current is not None:
+                current.append(char)
+
 
 class ProductSearchTool:
     def __init__(self, products_file: str = "products.json"):
         """Initialize the product search tool."""
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # One long-lived client (HTTP/2 when h2 is installed) so the TLS
+        # handshake is paid once and later queries reuse the connection
+        self._http_client = httpx.Client(
+            http2=h2 is not None,
+            limits=httpx.Limits(max_keepalive_connections=4)
+        )
+        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=self._http_client)
         self.products = self.load_products(products_file)
         
+        # Columnar (structure-of-arrays) view of the catalog, built once so
+        # filter_products can evaluate all criteria as one boolean mask.
+        self._prices = np.array([p["price"] for p in self.products], dtype=np.float32)
+        self._ratings = np.array([p["rating"] for p in self.products], dtype=np.float32)
+        self._in_stock = np.array([p["in_stock"] for p in self.products], dtype=bool)
+        # Categories are interned to small int codes (-1 for unknown ones)
+        self._cat_table = {name: code for code, name in enumerate(CATEGORIES)}
+        self._cat_codes = np.fromiter(
+            (self._cat_table.get(p["category"], -1) for p in self.products),
+            dtype=np.int8,
+            count=len(self.products)
+        )
+        self._names_lower = np.array([p["name"].lower() for p in self.products], dtype=str)
+        # numba is only imported (and the kernel compiled) for large catalogs
+        self._find_keyword = load_keyword_kernel() if len(self.products) >= NUMBA_MIN_PRODUCTS else None
+        if self._find_keyword is not None:
+            # Flat NUL-separated UTF-8 names with start offsets for the kernel
+            encoded_names = [name.encode() for name in self._names_lower]
+            self._name_bytes = np.frombuffer(b"\0".join(encoded_names) + b"\0", dtype=np.uint8)
+            self._name_offsets = np.zeros(len(encoded_names) + 1, dtype=np.int32)
+            np.cumsum([len(name) + 1 for name in encoded_names], out=self._name_offsets[1:])
+        # Lazily filled keyword -> boolean column of names containing it
+        self._keyword_masks: Dict[str, np.ndarray] = {}
+        self._cached_match_indices = functools.lru_cache(maxsize=256)(self._match_indices)
+        self._mask = np.empty(len(self.products), dtype=bool)
+        self._scratch = np.empty(len(self.products), dtype=bool)
+        
+        # Query -> criteria caches used by extract_criteria
+        self._exact_cache: Dict[str, Dict[str, Any]] = {}
+        self._semantic_vectors: Optional[np.ndarray] = None
+        self._semantic_criteria: List[Dict[str, Any]] = []
+        self._semantic_numbers: List[Tuple[float, ...]] = []
+        
+        # Non-blocking stdin used by read_queries to batch bursts of input
+        self._stdin_selector = self._create_stdin_selector()
+        self._stdin_buffer = b""
+        self._pending_lines: List[str] = []
+        
+        # The instructions are identical for every query, so they are built
+        # once and sent first. Together with the tool schema they are only a
+        # few hundred tokens, below the 1024 OpenAI's automatic prompt caching
+        # needs, so they are only cached if the catalog summary grows past that.
+        self._system_message = f"{SYSTEM_INSTRUCTIONS}\nCATALOG: {self.summarize_catalog()}\n"
+        
         if not self.client.api_key:
             raise ValueError("OpenAI API key not found. Please set OPENAI_API_KEY in your .env file.")
     
+    def close(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        self._http_client.close()
+    
+    def __enter__(self) -> "ProductSearchTool":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def summarize_catalog(self) -> str:
+        """
+        Describe the catalog in one line (category sizes, price and rating
+        ranges) so the model can calibrate criteria without seeing the rows.
+        """
+        if not self.products:
+            return "empty"
+        counts = np.bincount(self._cat_codes[self._cat_codes >= 0], minlength=len(CATEGORIES))
+        categories = ", ".join(f"{name} ({count})" for name, count in zip(CATEGORIES, counts))
+        return (f"{len(self.products)} products; categories: {categories}; "
+                f"price ${self._prices.min():.2f}-${self._prices.max():.2f}; "
+                f"rating {self._ratings.min():.1f}-{self._ratings.max():.1f}")
+    
+    def _create_stdin_selector(self) -> Optional[selectors.BaseSelector]:
+        """Return a selector polling stdin, or None where stdin cannot be polled."""
+        if os.name != "posix":
+            return None
+        try:
+            selector = selectors.DefaultSelector()
+            selector.register(sys.stdin.fileno(), selectors.EVENT_READ)
+        except (ValueError, OSError):
+            return None
+        return selector
+    
     def load_products(self, file_path: str) -> List[Dict[str, Any]]:
         """Load products from JSON file."""
         try:
-            with open(file_path, 'r') as file:
-                products = json.load(file)
+            with open(file_path, 'rb') as file:
+                if ijson:
+                    # Stream one product object at a time instead of
+                    # materializing the whole document first
+                    items = ijson.items(file, "item", use_float=True)
+                else:
+                    data = file.read()
+                    items = orjson.loads(data) if orjson else json.loads(data)
+                products = [{field: item[field] for field in PRODUCT_FIELDS} for item in items]
             print(f"Loaded {len(products)} products from {file_path}")
             return products
         except FileNotFoundError:
             print(f"Error: Products file '{file_path}' not found.")
             sys.exit(1)
-        except json.JSONDecodeError:
+        except JSON_ERRORS:
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError
             print(f"Error: Invalid JSON in '{file_path}'.")
             sys.exit(1)
     
     def get_function_definition(self) -> Dict[str, Any]:
-        """Define the function schema for OpenAI function calling."""
-        return {
-            "name": "filter_and_return_products",
-            "description": "Filter the product dataset based on user preferences and return matching products",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "filtered_products": {
-                        "type": "array",
-                        "description": "Array of products that match the user's criteria",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "name": {"type": "string"},
-                                "category": {"type": "string"},
-                                "price": {"type": "number"},
-                                "rating": {"type": "number"},
-                                "in_stock": {"type": "boolean"}
-                            },
-                            "required": ["name", "category", "price", "rating", "in_stock"]
-                        }
-                    },
-                    "criteria_used": {
-                        "type": "string",
-                        "description": "Description of the filtering criteria that were applied"
-                    }
-                },
-                "required": ["filtered_products", "criteria_used"]
-            }
-        }
+        """Define the tool schema for OpenAI function calling."""
+        return FILTER_FUNCTION
     
-    def search_products(self, user_query: str) -> List[Dict[str, Any]]:
-        """Search products using OpenAI function calling."""
-        try:
-            # Create the system message with the complete product dataset
-            products_data = json.dumps(self.products, indent=2)
-            
-            system_message = f"""
-            You are a product search assistant. You must filter the provided product dataset based on user preferences and return only the matching products.
-
-            PRODUCT DATASET:
-            {products_data}
-
-            INSTRUCTIONS:
-            1. Analyze the user's natural language query to understand their requirements
-            2. Filter the products based on their criteria such as:
-               - Category (Electronics, Fitness, Kitchen, Books, Clothing)
-               - Price constraints (e.g., "under $100", "between $50-$200")
-               - Rating requirements (e.g., "great rating" = 4.5+, "good rating" = 4.0+)
-               - Stock availability ("in stock" = in_stock: true)
-               - Keywords (match in product names)
-            3. Return ONLY the products that match ALL specified criteria
-            4. Use the filter_and_return_products function to return results
-            
-            EXAMPLES:
-            - "smartphone under $800" → filter by keyword "smartphone" AND price ≤ 800
-            - "fitness equipment with great ratings" → category "Fitness" AND rating ≥ 4.5
-            - "kitchen appliances under $100 in stock" → category "Kitchen" AND price ≤ 100 AND in_stock = true
-            
-            Be precise in filtering - only return products that truly match the user's requirements.
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": f"Find products based on: {user_query}"}
-                ],
-                functions=[self.get_function_definition()],
-                function_call={"name": "filter_and_return_products"}
-            )
-            
-            # Extract function call results
-            function_call = response.choices[0].message.function_call
-            if function_call and function_call.name == "filter_and_return_products":
-                arguments = json.loads(function_call.arguments)
-                print(f"Criteria applied: {arguments.get('criteria_used', 'N/A')}")
-                return arguments.get('filtered_products', [])
+    def get_batch_function_definition(self) -> Dict[str, Any]:
+        """Define the tool schema returning criteria for several queries at once."""
+        return FILTER_BATCH_FUNCTION
+    
+    def _keyword_mask(self, keyword: str) -> np.ndarray:
+        """Return the cached boolean column of product names containing the keyword."""
+        mask = self._keyword_masks.get(keyword)
+        if mask is None:
+            if self._find_keyword is not None:
+                keyword_bytes = np.frombuffer(keyword.encode(), dtype=np.uint8)
+                mask = self._find_keyword(self._name_bytes, self._name_offsets, keyword_bytes)
             else:
+                mask = np.char.find(self._names_lower, keyword) >= 0
+            self._keyword_masks[keyword] = mask
+        return mask
+    
+    def _match_indices(self, category: Optional[str], min_price: Optional[float],
+                       max_price: Optional[float], min_rating: Optional[float],
+                       in_stock_only: bool, keywords: Tuple[str, ...]) -> np.ndarray:
+        """Return indices of products matching all criteria, combined into a single boolean mask."""
+        # Every stage writes into the preallocated buffers, so the only
+        # allocation per call is the final index array
+        mask, scratch = self._mask, self._scratch
+        mask.fill(True)
+        
+        if category:
+            np.equal(self._cat_codes, self._cat_table.get(category, -2), out=scratch)
+            mask &= scratch
+        if min_price is not None:
+            np.greater_equal(self._prices, min_price, out=scratch)
+            mask &= scratch
+        if max_price is not None:
+            np.less_equal(self._prices, max_price, out=scratch)
+            mask &= scratch
+        if min_rating is not None:
+            np.greater_equal(self._ratings, min_rating, out=scratch)
+            mask &= scratch
+        if in_stock_only:
+            mask &= self._in_stock
+        if keywords:
+            scratch.fill(False)
+            for keyword in keywords:
+                scratch |= self._keyword_mask(keyword)
+            mask &= scratch
+        
+        return np.flatnonzero(mask)
+    
+    def filter_products(self, criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Filter products locally by the extracted criteria."""
+        # Normalized to a hashable tuple so equivalent criteria share one
+        # cached evaluation, whichever query they were extracted from
+        indices = self._cached_match_indices(
+            criteria.get("category") or None,
+            criteria.get("min_price"),
+            criteria.get("max_price"),
+            criteria.get("min_rating"),
+            bool(criteria.get("in_stock_only")),
+            normalize_keywords(criteria.get("product_keywords") or [])
+        )
+        return [self.products[i] for i in indices]
+    
+    def _embed(self, texts: List[str]) -> Optional[np.ndarray]:
+        """Embed queries for the semantic cache as unit rows; None if the embedding call fails."""
+        try:
+            response = self.client.embeddings.create(model=EMBEDDING_MODEL, input=texts)
+        except Exception as e:
+            print(f"Semantic cache unavailable: {e}")
+            return None
+        vectors = np.array([item.embedding for item in response.data], dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    
+    def _semantic_lookup(self, vector: np.ndarray, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Return cached criteria of the most similar previous query above the threshold.
+        
+        Queries differing only in their numbers ("under $300" vs "under $800")
+        embed almost identically, so a hit also needs the same numbers.
+        """
+        if self._semantic_vectors is None:
+            return None
+        similarities = self._semantic_vectors @ vector
+        numbers = query_numbers(query)
+        for best in np.argsort(similarities)[::-1]:
+            if similarities[best] < SEMANTIC_CACHE_THRESHOLD:
+                break
+            if self._semantic_numbers[best] == numbers:
+                return self._semantic_criteria[best]
+        return None
+    
+    def _semantic_store(self, vector: np.ndarray, query: str, criteria: Dict[str, Any]) -> None:
+        """Add a query embedding, its numbers and its criteria to the semantic cache."""
+        if self._semantic_vectors is None:
+            self._semantic_vectors = vector[np.newaxis, :]
+        else:
+            self._semantic_vectors = np.vstack([self._semantic_vectors, vector])
+        self._semantic_numbers.append(query_numbers(query))
+        self._semantic_criteria.append(criteria)
+    
+    @staticmethod
+    def parse_arguments(arguments: str) -> Dict[str, Any]:
+        """
+        Parse tool call arguments, recovering from malformed JSON.
+        
+        If the arguments are not valid JSON, the last balanced {...} object
+        in the text is parsed instead; the original error is raised if no
+        such object parses.
+        """
+        try:
+            return json.loads(arguments)
+        except json.JSONDecodeError:
+            end = arguments.rfind("}")
+            depth = 0
+            for start in range(end, -1, -1):
+                if arguments[start] == "}":
+                    depth += 1
+                elif arguments[start] == "{":
+                    depth -= 1
+                    if depth == 0:
+                        try:
+                            return json.loads(arguments[start:end + 1])
+                        except json.JSONDecodeError:
+                            break
+            raise
+    
+    @staticmethod
+    def clean_criteria(criteria: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop criteria the model left unspecified (null or empty)."""
+        return {key: value for key, value in criteria.items() if value is not None and value != []}
+    
+    def stream_function_arguments(self, user_message: str, definition: Dict[str, Any]) -> Iterator[str]:
+        """Force a call of the given tool and yield its arguments as they are generated."""
+        stream = self.client.chat.completions.create(
+            model="gpt-4.1-mini",
+            messages=[
+                {"role": "system", "content": self._system_message},
+                {"role": "user", "content": user_message}
+            ],
+            tools=[{"type": "function", "function": definition}],
+            tool_choice={"type": "function", "function": {"name": definition["name"]}},
+            parallel_tool_calls=False,
+            stream=True
+        )
+        
+        # Deltas of every call share the stream; only the first call's are
+        # kept, so a stray second call cannot corrupt the JSON arguments
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            for tool_call in chunk.choices[0].delta.tool_calls or []:
+                if tool_call.index == 0 and tool_call.function and tool_call.function.arguments:
+                    yield tool_call.function.arguments
+    
+    def request_criteria(self, user_query: str) -> Optional[Dict[str, Any]]:
+        """Extract filter criteria from the query with OpenAI function calling."""
+        try:
+            arguments = "".join(self.stream_function_arguments(
+                f"Find products based on: {user_query}", self.get_function_definition()
+            ))
+            if not arguments:
                 print("No function call made by OpenAI.")
-                return []
+                return None
+            return self.clean_criteria(self.parse_arguments(arguments))
+                
+        except Exception as e:
+            print(f"Error calling OpenAI API: {e}")
+            return None
+    
+    def request_criteria_batch(self, user_queries: List[str]) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Extract filter criteria for several queries with a single OpenAI call.
+        
+        The response is streamed and each query's criteria are yielded as
+        soon as its object in the "searches" array is complete, so the first
+        results can be shown while the rest are still being generated.
+        """
+        numbered = "\n".join(f"{i}) {query}" for i, query in enumerate(user_queries, 1))
+        count = 0
+        try:
+            chunks = self.stream_function_arguments(
+                f"Answer these {len(user_queries)} queries, one search per query in the same order:\n{numbered}",
+                self.get_batch_function_definition()
+            )
+            for search in iter_json_objects(chunks, depth=2):
+                if count == len(user_queries):
+                    break
+                count += 1
+                yield self.clean_criteria(search)
                 
         except Exception as e:
             print(f"Error calling OpenAI API: {e}")
+        
+        # Pad in case the model returned fewer searches than queries
+        for _ in range(count, len(user_queries)):
+            yield None
+    
+    def extract_criteria_batch(self, user_queries: List[str]) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Yield filter criteria for each query in order, reusing the results of earlier queries.
+        
+        Exact repeats are served from a dict keyed on the normalized query;
+        near-duplicates ("smartphone under 800" vs "smartphones under $800")
+        are served from an embedding cache by cosine similarity. Queries that
+        miss both tiers share a single streamed chat completion.
+        """
+        keys = [" ".join(query.lower().split()) for query in user_queries]
+        results = [self._exact_cache.get(key) for key in keys]
+        # Repeated queries within the batch are looked up and requested once
+        first_index = {}
+        for i, key in enumerate(keys):
+            first_index.setdefault(key, i)
+        misses = [i for i, criteria in enumerate(results) if criteria is None and first_index[keys[i]] == i]
+        
+        # Queries simple enough for the local parser skip the network entirely
+        for i in misses:
+            results[i] = parse_query_locally(user_queries[i])
+            if results[i] is not None:
+                self._exact_cache[keys[i]] = results[i]
+        misses = [i for i in misses if results[i] is None]
+        
+        pending = {}
+        if misses:
+            vectors = self._embed([keys[i] for i in misses])
+            for n, i in enumerate(misses):
+                vector = vectors[n] if vectors is not None else None
+                if vector is not None:
+                    results[i] = self._semantic_lookup(vector, keys[i])
+                    if results[i] is not None:
+                        self._exact_cache[keys[i]] = results[i]
+                if results[i] is None:
+                    pending[i] = vector
+        
+        fetched = iter(())
+        if len(pending) == 1:
+            fetched = iter([self.request_criteria(user_queries[next(iter(pending))])])
+        elif pending:
+            fetched = self.request_criteria_batch([user_queries[i] for i in pending])
+        
+        for i, key in enumerate(keys):
+            if i in pending:
+                results[i] = next(fetched)
+                if results[i] is not None:
+                    self._exact_cache[key] = results[i]
+                    if pending[i] is not None:
+                        self._semantic_store(pending[i], key, results[i])
+            elif results[i] is None:
+                results[i] = results[first_index[key]]
+            yield results[i]
+    
+    def extract_criteria(self, user_query: str) -> Optional[Dict[str, Any]]:
+        """Extract filter criteria for a single query, using the caches."""
+        return next(self.extract_criteria_batch([user_query]))
+    
+    def apply_criteria(self, criteria: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Report extracted criteria and return the products matching them."""
+        if criteria is None:
             return []
+        
+        print(f"Extracted criteria: {criteria}")
+        return self.filter_products(criteria)
+    
+    def search_products(self, user_query: str) -> List[Dict[str, Any]]:
+        """Search products by extracting criteria with OpenAI and filtering locally."""
+        return self.apply_criteria(self.extract_criteria(user_query))
     
     def format_results(self, products: List[Dict[str, Any]]) -> None:
         """Format and display the search results."""
@@ -134,47 +676,117 @@ class ProductSearchTool:
             print("\nNo products found matching your criteria.")
             return
         
-        print(f"\nFiltered Products ({len(products)} found):")
-        print("-" * 60)
-        
+        # Assembled into one string and written once rather than three
+        # print() calls per product
+        lines = [f"\nFiltered Products ({len(products)} found):", "-" * 60]
         for i, product in enumerate(products, 1):
             stock_status = "In Stock" if product["in_stock"] else "Out of Stock"
-            print(f"{i}. {product['name']} - ${product['price']}, Rating: {product['rating']}, {stock_status}")
-            print(f"   Category: {product['category']}")
-            print()
+            lines.append(f"{i}. {product['name']} - ${product['price']}, Rating: {product['rating']}, {stock_status}")
+            lines.append(f"   Category: {product['category']}\n")
+        sys.stdout.write("\n".join(lines) + "\n")
+    
+    def read_queries(self, prompt: str) -> List[str]:
+        """
+        Read the next batch of queries from stdin.
+        
+        Blocks for the first line, then keeps collecting lines that arrive
+        within BATCH_WINDOW_SECONDS (e.g. a pasted block of queries), up to
+        BATCH_MAX_QUERIES, so they can share one OpenAI call. Falls back to
+        plain input() where stdin cannot be polled (e.g. Windows consoles).
+        """
+        if self._stdin_selector is None:
+            return [input(prompt)]
+        
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        fd = sys.stdin.fileno()
+        # Lines left over from an earlier read are returned right away,
+        # together with whatever input is already waiting
+        deadline = time.monotonic() if self._pending_lines else None
+        while len(self._pending_lines) < BATCH_MAX_QUERIES:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not self._stdin_selector.select(timeout):
+                break
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                # A last line without a trailing newline still counts
+                if self._stdin_buffer:
+                    self._pending_lines.append(self._stdin_buffer.decode(errors="replace"))
+                    self._stdin_buffer = b""
+                if not self._pending_lines:
+                    raise EOFError
+                break
+            *lines, self._stdin_buffer = (self._stdin_buffer + chunk).split(b"\n")
+            self._pending_lines.extend(line.decode(errors="replace") for line in lines)
+            if self._pending_lines and deadline is None:
+                deadline = time.monotonic() + BATCH_WINDOW_SECONDS
+        
+        batch = self._pending_lines[:BATCH_MAX_QUERIES]
+        del self._pending_lines[:BATCH_MAX_QUERIES]
+        return batch
+    
+    def warm_up_connection(self) -> None:
+        """
+        Open the HTTPS connection to OpenAI ahead of the first query.
+        
+        Meant to run on a background thread while the user is reading the
+        banner and typing, so DNS and TLS setup are off the critical path.
+        """
+        try:
+            self.client.with_options(timeout=5).models.list()
+        except Exception:
+            # Purely an optimization; the first real request will connect
+            pass
     
     def run_interactive_search(self):
         """Run the interactive product search."""
-        print("=" * 60)
-        print("      Welcome to the AI-Powered Product Search Tool")
-        print("=" * 60)
-        print("\nDescribe what you're looking for in natural language.")
-        print("Examples:")
-        print("- 'I need a smartphone under $800'")
-        print("- 'Find me fitness equipment with great ratings'")
-        print("- 'Looking for kitchen appliances under $100 that are in stock'")
-        print("\nType 'quit' to exit.")
-        print("-" * 60)
+        threading.Thread(target=self.warm_up_connection, daemon=True).start()
+        
+        sys.stdout.write("\n".join([
+            "=" * 60,
+            "      Welcome to the AI-Powered Product Search Tool",
+            "=" * 60,
+            "\nDescribe what you're looking for in natural language.",
+            "Examples:",
+            "- 'I need a smartphone under $800'",
+            "- 'Find me fitness equipment with great ratings'",
+            "- 'Looking for kitchen appliances under $100 that are in stock'",
+            "\nType 'quit' to exit.",
+            "-" * 60,
+        ]) + "\n")
         
         while True:
             try:
-                user_input = input("\nWhat are you looking for? ").strip()
-                
-                if user_input.lower() in ['quit', 'exit', 'q']:
-                    print("Thank you for using the Product Search Tool!")
-                    break
+                queries = []
+                quit_requested = False
+                for line in self.read_queries("\nWhat are you looking for? "):
+                    user_input = line.strip()
+                    if user_input.lower() in ['quit', 'exit', 'q']:
+                        quit_requested = True
+                        break
+                    if user_input:
+                        queries.append(user_input)
                 
-                if not user_input:
+                if not queries and not quit_requested:
                     print("Please enter a search query.")
                     continue
                 
-                print(f"\nSearching for: '{user_input}'")
-                print("Processing with OpenAI...")
+                if queries:
+                    for user_input in queries:
+                        print(f"\nSearching for: '{user_input}'")
+                    print("Processing with OpenAI...")
+                    
+                    for user_input, criteria in zip(queries, self.extract_criteria_batch(queries)):
+                        if len(queries) > 1:
+                            print(f"\nResults for: '{user_input}'")
+                        results = self.apply_criteria(criteria)
+                        self.format_results(results)
                 
-                results = self.search_products(user_input)
-                self.format_results(results)
+                if quit_requested:
+                    print("Thank you for using the Product Search Tool!")
+                    break
                 
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError):
                 print("\n\nGoodbye!")
                 break
             except Exception as e:
@@ -184,8 +796,8 @@ class ProductSearchTool:
 def main():
     """Main function to run the application."""
     try:
-        search_tool = ProductSearchTool()
-        search_tool.run_interactive_search()
+        with ProductSearchTool() as search_tool:
+            search_tool.run_interactive_search()
     except Exception as e:
         print(f"Failed to initialize application: {e}")
         sys.exit(1)
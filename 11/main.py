@@ -7,43 +7,473 @@ Uses OpenAI Whisper API for transcription and GPT for analysis
 import os
 import json
 import argparse
+import asyncio
+import concurrent.futures
+import contextlib
 import datetime
-from pathlib import Path
-from typing import Dict, List, Any
-import openai
-from dotenv import load_dotenv
+import glob
+import gzip
+import hashlib
+import importlib.util
+import logging
+import mimetypes
 import re
+import shutil
+import subprocess
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Any, Tuple, Union
+from aiolimiter import AsyncLimiter
+from tenacity import before_sleep_log, retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+try:
+    import requests
+    from requests_toolbelt import MultipartEncoder
+except ImportError:  # optional: fall back to the SDK upload
+    requests = None
+    MultipartEncoder = None
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used instead
+    orjson = None
+
+try:
+    import mutagen
+except ImportError:  # optional: ffprobe is used for durations instead
+    mutagen = None
+
+logger = logging.getLogger(__name__)
+
+# Audio longer than this is split at silences into roughly one-minute
+# segments that are transcribed in parallel
+CHUNK_THRESHOLD_SECONDS = 120
+SEGMENT_TARGET_SECONDS = 60
+SEGMENT_MIN_SECONDS = 45
+SEGMENT_MAX_SECONDS = 90
+# Padding added around cuts that could not be placed in a silence
+SEGMENT_OVERLAP_SECONDS = 1.0
+MAX_PARALLEL_TRANSCRIPTIONS = 4
+# Streamed uploads block a thread each for their whole duration, so they
+# get their own pool rather than starving the default executor
+MAX_UPLOAD_THREADS = 16
+SILENCE_PATTERN = re.compile(r"silence_(start|end): (-?[0-9.]+)")
+
+# Topic candidates are counted locally and only the most frequent terms
+# (plus a short excerpt for context) are sent to GPT
+# (\w is Unicode-aware, so non-Latin transcripts yield terms too)
+TERM_PATTERN = re.compile(r"\w[\w'-]*")
+TOP_TERMS = 50
+EXCERPT_CHARS = 2000
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are aren't as at be because been before
+being below between both but by can can't cannot could couldn't did didn't do does doesn't doing
+don't down during each even few for from further get gets getting go goes going gone got had hadn't
+has hasn't have haven't having he he'd he'll he's her here here's hers herself him himself his how
+how's i i'd i'll i'm i've if in into is isn't it it's its itself just know let's like lot make many
+may me might more most much must mustn't my myself no nor not now of off oh ok okay on once one only
+or other ought our ours ourselves out over own really right said say says see so some such than that
+that's the their theirs them themselves then there there's these they they'd they'll they're
+they've thing things think this those through to too uh um under until up us very want was wasn't
+way we we'd we'll we're we've well were weren't what what's when when's where where's which while
+who who's whom why why's will with won't would wouldn't yeah yes you you'd you'll you're you've
+your yours yourself yourselves
+""".split())
 
 class SpeechAnalyzer:
-    def __init__(self):
+    def __init__(
+        self,
+        use_cache: bool = True,
+        transcode: bool = True,
+        rpm: int = 60,
+        whisper_rpm: int = 50,
+        compact: bool = False
+    ):
+        # openai and dotenv are slow to import, so they are only loaded once
+        # an analyzer is actually needed (not for --help or bad arguments)
+        import openai
+        from dotenv import load_dotenv
+        
         # Load environment variables
         load_dotenv()
         
-        # Set up OpenAI client
-        self.client = openai.OpenAI(
-            api_key=os.getenv('OPENAI_API_KEY')
-        )
-        
         if not os.getenv('OPENAI_API_KEY'):
             raise ValueError("OPENAI_API_KEY not found. Please set it in your .env file.")
         
+        # With requests-toolbelt installed, uploads stream from disk in
+        # small chunks instead of being read into memory by the SDK
+        self.upload_session = None
+        if MultipartEncoder is not None:
+            self.upload_session = requests.Session()
+            self.upload_session.headers["Authorization"] = f"Bearer {os.getenv('OPENAI_API_KEY')}"
+        
         # Create directories for outputs
         self.transcriptions_dir = Path("transcriptions")
         self.transcriptions_dir.mkdir(exist_ok=True)
+        # Compact mode writes minified JSON and gzipped markdown, for batches
+        # whose outputs are read by tools rather than people
+        self.compact = compact
+        # Output name prefixes handed out so far, so that files with the same
+        # name processed in the same second do not overwrite each other
+        self._output_prefixes = set()
+        
+        # Content-addressed cache of GPT responses; with use_cache=False
+        # lookups are skipped but fresh responses are still stored
+        self.cache_dir = Path(".gpt_cache")
+        self.cache_dir.mkdir(exist_ok=True)
+        self.use_cache = use_cache
+        
+        # The async client and rate limiters are bound to an event loop, so
+        # they are created by session() inside the running loop
+        self.rpm = rpm
+        self.whisper_rpm = whisper_rpm
+        self.client = None
+        self.limiters: Dict[str, AsyncLimiter] = {}
+        self.upload_executor = None
+        self._session_depth = 0
+        
+        # Every API call waits for its rate limiter (shared by all files in
+        # a batch) and is retried with backoff on rate limits, timeouts,
+        # connection errors and server errors
+        self.api_error = openai.APIError
+        self.transient_errors = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+        if requests is not None:
+            self.transient_errors += (requests.Timeout, requests.ConnectionError)
+        self.retry_policy = retry(
+            retry=retry_if_exception(self._is_transient),
+            wait=wait_random_exponential(min=1, max=30),
+            stop=stop_after_attempt(6),
+            before_sleep=before_sleep_log(logger, logging.WARNING),
+            reraise=True
+        )
+        
+        # Whisper resamples everything to 16kHz mono, so uploads are shrunk
+        # to that (as Opus) first when ffmpeg is available
+        self.audio_cache_dir = Path(".audio_cache")
+        self.transcode = transcode and shutil.which("ffmpeg") is not None
     
-    def transcribe_audio(self, audio_file_path: str) -> str:
+    @contextlib.asynccontextmanager
+    async def session(self) -> AsyncIterator[None]:
         """
-        Transcribe audio file using OpenAI Whisper API
+        Open the async OpenAI client and rate limiters for the running loop
+        
+        Nested sessions (a batch around its files, a file around its API
+        calls) share the outermost one, which closes the client on exit, so
+        every file in a batch reuses one connection pool and set of limits
+        while separate asyncio.run() calls each get their own.
         """
-        print(f"🎵 Transcribing audio file: {audio_file_path}")
+        if self._session_depth == 0:
+            import httpx
+            import openai
+            
+            self.client = openai.AsyncOpenAI(
+                api_key=os.getenv('OPENAI_API_KEY'),
+                # retry_policy retries instead, so retries also wait for the limiters
+                max_retries=0,
+                # Concurrent requests share a few (HTTP/2 multiplexed, when h2
+                # is installed) connections instead of handshaking anew
+                http_client=httpx.AsyncClient(
+                    http2=importlib.util.find_spec("h2") is not None,
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+                    timeout=httpx.Timeout(60.0, connect=10.0)
+                )
+            )
+            self.limiters = {
+                "chat": AsyncLimiter(self.rpm, 60),
+                "whisper": AsyncLimiter(self.whisper_rpm, 60)
+            }
+            if self.upload_session is not None:
+                self.upload_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=MAX_UPLOAD_THREADS, thread_name_prefix="whisper-upload"
+                )
+        self._session_depth += 1
+        try:
+            yield
+        finally:
+            self._session_depth -= 1
+            if self._session_depth == 0:
+                client, self.client = self.client, None
+                await client.close()
+                if self.upload_executor is not None:
+                    executor, self.upload_executor = self.upload_executor, None
+                    executor.shutdown()
+    
+    def _is_transient(self, error: BaseException) -> bool:
+        """
+        Whether a failed API call is worth retrying
+        """
+        if isinstance(error, self.transient_errors):
+            return True
+        # The streamed Whisper upload reports rate limits and server errors
+        # as an HTTP error
+        return (requests is not None and isinstance(error, requests.HTTPError)
+                and error.response is not None
+                and (error.response.status_code == 429 or error.response.status_code >= 500))
+    
+    async def _call_api(self, limiter: str, request: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run an API request under the named rate limiter, retrying transient failures
+        """
+        async def limited_request() -> Any:
+            async with self.limiters[limiter]:
+                return await request()
+        
+        async with self.session():
+            return await self.retry_policy(limited_request)()
+    
+    async def _cached_chat(self, **request: Any) -> str:
+        """
+        Run a chat completion, reusing a stored response for an identical request
+        """
+        # The key covers the whole request (model, messages, temperature...),
+        # so any prompt or parameter change misses the cache
+        key_material = json.dumps(request, sort_keys=True)
+        cache_path = self.cache_dir / f"{hashlib.sha256(key_material.encode('utf-8')).hexdigest()}.json"
+        
+        if self.use_cache and cache_path.exists():
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)["content"]
+        
+        response = await self._call_api(
+            "chat", lambda: self.client.chat.completions.create(**request)
+        )
+        choice = response.choices[0]
+        content = choice.message.content
         
+        # Only complete responses are stored; one cut off by max_tokens (or
+        # a content filter) would otherwise be replayed on every later run
+        if choice.finish_reason == "stop":
+            # Write atomically so a concurrent or interrupted run never sees a partial file
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"content": content}, f)
+            os.replace(tmp_path, cache_path)
+        
+        return content
+    
+    @staticmethod
+    def _is_whisper_ready(audio_file_path: str) -> bool:
+        """
+        Check with ffprobe whether the audio is already 16kHz mono Opus
+        """
+        if shutil.which("ffprobe") is None:
+            return False
+        probe = subprocess.run(
+            ["ffprobe", "-v", "error", "-select_streams", "a:0",
+             "-show_entries", "stream=codec_name,sample_rate,channels",
+             "-of", "json", audio_file_path],
+            capture_output=True, text=True
+        )
+        if probe.returncode != 0:
+            return False
+        streams = json.loads(probe.stdout).get("streams") or [{}]
+        stream = streams[0]
+        return (stream.get("codec_name") == "opus"
+                and stream.get("sample_rate") == "16000"
+                and stream.get("channels") == 1)
+    
+    def _maybe_transcode(self, audio_file_path: str) -> str:
+        """
+        Return the path to upload: a cached 16kHz mono Opus copy of the audio,
+        or the original file if transcoding is off, unneeded or fails
+        """
+        if not self.transcode or self._is_whisper_ready(audio_file_path):
+            return audio_file_path
+        
+        # Keyed by path, size and mtime so an edited file is transcoded again
+        stat = os.stat(audio_file_path)
+        key_material = f"{Path(audio_file_path).resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+        self.audio_cache_dir.mkdir(exist_ok=True)
+        ogg_path = self.audio_cache_dir / f"{hashlib.sha256(key_material.encode('utf-8')).hexdigest()}.ogg"
+        if ogg_path.exists():
+            return str(ogg_path)
+        
+        tmp_path = ogg_path.with_name(f"{ogg_path.name}.{os.getpid()}.tmp")
+        result = subprocess.run(
+            ["ffmpeg", "-y", "-v", "error", "-i", audio_file_path,
+             "-vn", "-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "24k",
+             "-f", "ogg", str(tmp_path)],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            print(f"⚠️  Could not transcode {audio_file_path}, uploading it as is: {result.stderr.strip()}")
+            return audio_file_path
+        
+        os.replace(tmp_path, ogg_path)
+        return str(ogg_path)
+    
+    @staticmethod
+    def _audio_duration_seconds(audio_file_path: str) -> float:
+        """
+        Audio duration in seconds, or 0.0 if it cannot be read
+        
+        mutagen reads it from the file headers without decoding; ffprobe
+        covers formats mutagen does not know.
+        """
+        if mutagen is not None:
+            try:
+                audio = mutagen.File(audio_file_path)
+            except mutagen.MutagenError:
+                audio = None
+            if audio is not None and audio.info.length:
+                return float(audio.info.length)
+        if shutil.which("ffprobe") is None:
+            return 0.0
+        probe = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", audio_file_path],
+            capture_output=True, text=True
+        )
         try:
+            return float(probe.stdout.strip())
+        except ValueError:
+            return 0.0
+    
+    def _split_on_silence(self, audio_file_path: str, segment_dir: str) -> List[Tuple[str, bool]]:
+        """
+        Split long audio into ~60s segment files, cutting in silences
+        
+        Returns (segment path, starts at a padded cut) pairs, or just
+        [(audio_file_path, False)] for short audio, when ffmpeg is not
+        available or when splitting fails.
+        """
+        duration = self._audio_duration_seconds(audio_file_path)
+        if duration < CHUNK_THRESHOLD_SECONDS or shutil.which("ffmpeg") is None:
+            return [(audio_file_path, False)]
+        
+        detect = subprocess.run(
+            ["ffmpeg", "-v", "info", "-nostats", "-i", audio_file_path,
+             "-af", "silencedetect=noise=-30dB:d=0.5", "-f", "null", "-"],
+            capture_output=True, text=True
+        )
+        silence_starts = []
+        silence_middles = []
+        for kind, value in SILENCE_PATTERN.findall(detect.stderr):
+            if kind == "start":
+                silence_starts.append(float(value))
+            elif silence_starts:
+                silence_middles.append((silence_starts[-1] + float(value)) / 2)
+        
+        # Greedily cut at the silence nearest the target length; fall back
+        # to a hard cut, padded on both sides, when none is in range
+        cuts = []
+        position = 0.0
+        while duration - position > SEGMENT_MAX_SECONDS:
+            candidates = [t for t in silence_middles
+                          if position + SEGMENT_MIN_SECONDS <= t <= position + SEGMENT_MAX_SECONDS]
+            if candidates:
+                position = min(candidates, key=lambda t: abs(t - position - SEGMENT_TARGET_SECONDS))
+                cuts.append((position, 0.0))
+            else:
+                position += SEGMENT_TARGET_SECONDS
+                cuts.append((position, SEGMENT_OVERLAP_SECONDS))
+        
+        bounds = [(0.0, 0.0)] + cuts + [(duration, 0.0)]
+        # Segments are encoded like transcoded uploads, or cut from the
+        # stream without re-encoding when it already is the transcoded copy
+        # or with --no-transcode
+        is_transcoded = Path(audio_file_path).resolve().parent == self.audio_cache_dir.resolve()
+        if self.transcode and not is_transcoded:
+            extension = ".ogg"
+            codec_args = ["-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "24k", "-f", "ogg"]
+        else:
+            extension = Path(audio_file_path).suffix
+            codec_args = ["-c:a", "copy"]
+        
+        segments = []
+        for index, ((start, start_pad), (end, end_pad)) in enumerate(zip(bounds, bounds[1:])):
+            segment_path = os.path.join(segment_dir, f"segment_{index:03d}{extension}")
+            start = max(0.0, start - start_pad)
+            try:
+                subprocess.run(
+                    ["ffmpeg", "-y", "-v", "error", "-ss", f"{start:.3f}", "-t", f"{end + end_pad - start:.3f}",
+                     "-i", audio_file_path, "-vn", *codec_args, segment_path],
+                    check=True, capture_output=True, text=True
+                )
+            except subprocess.CalledProcessError as e:
+                print(f"⚠️  Could not split {audio_file_path}, transcribing it whole: {e.stderr.strip()}")
+                return [(audio_file_path, False)]
+            segments.append((segment_path, start_pad > 0))
+        
+        return segments
+    
+    @staticmethod
+    def _merge_transcripts(parts: List[str], padded: List[bool], max_overlap_words: int = 12) -> str:
+        """
+        Join segment transcripts in order, dropping words repeated across a
+        padded cut (the longest suffix of the text so far that matches a
+        prefix of the next part)
+        
+        padded[i] tells whether part i starts at a padded cut; parts cut in
+        a silence are joined as they are, so genuinely repeated words stay.
+        """
+        def normalize(word: str) -> str:
+            return word.strip(".,!?;:\"'()").lower()
+        
+        words = []
+        for part, overlaps in zip(parts, padded):
+            part_words = part.split()
+            overlap = 0
+            for n in range(min(max_overlap_words, len(words), len(part_words)) if overlaps else 0, 0, -1):
+                if [normalize(w) for w in words[-n:]] == [normalize(w) for w in part_words[:n]]:
+                    overlap = n
+                    break
+            words.extend(part_words[overlap:])
+        return " ".join(words)
+    
+    async def _transcribe_file(self, audio_file_path: str) -> str:
+        """
+        Send one audio file to the Whisper API
+        """
+        async def upload() -> str:
+            if self.upload_session is not None:
+                # Same endpoint as the SDK, so OPENAI_BASE_URL is honored
+                url = f"{str(self.client.base_url).rstrip('/')}/audio/transcriptions"
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self.upload_executor, self._stream_transcription, audio_file_path, url
+                )
+            
             with open(audio_file_path, "rb") as audio_file:
-                transcript = self.client.audio.transcriptions.create(
+                return await self.client.audio.transcriptions.create(
                     model="whisper-1",
                     file=audio_file,
                     response_format="text"
                 )
+        
+        return await self._call_api("whisper", upload)
+    
+    async def transcribe_audio(self, audio_file_path: str) -> str:
+        """
+        Transcribe audio file using OpenAI Whisper API
+        
+        Long recordings are split at silences and the segments transcribed
+        concurrently, so latency follows the slowest segment rather than
+        the total duration.
+        """
+        print(f"🎵 Transcribing audio file: {audio_file_path}")
+        
+        try:
+            loop = asyncio.get_running_loop()
+            with tempfile.TemporaryDirectory() as segment_dir:
+                segments = await loop.run_in_executor(
+                    None, self._split_on_silence, audio_file_path, segment_dir
+                )
+                if len(segments) == 1:
+                    transcript = await self._transcribe_file(segments[0][0])
+                else:
+                    print(f"✂️  Transcribing {len(segments)} segments in parallel...")
+                    semaphore = asyncio.Semaphore(MAX_PARALLEL_TRANSCRIPTIONS)
+                    
+                    async def transcribe_segment(segment_path: str) -> str:
+                        async with semaphore:
+                            return await self._transcribe_file(segment_path)
+                    
+                    parts = await asyncio.gather(*(transcribe_segment(path) for path, _ in segments))
+                    transcript = self._merge_transcripts(parts, [padded for _, padded in segments])
             
             print("✅ Transcription completed successfully!")
             return transcript
@@ -52,48 +482,92 @@ class SpeechAnalyzer:
             print(f"❌ Error during transcription: {str(e)}")
             raise
     
-    def save_transcription(self, transcript: str, original_filename: str) -> str:
+    def _stream_transcription(self, audio_file_path: str, url: str) -> str:
+        """
+        POST the audio to Whisper as a streamed multipart body
+        
+        MultipartEncoder reads the file lazily while the request is sent,
+        so memory stays flat regardless of the audio size.
+        """
+        mime = mimetypes.guess_type(audio_file_path)[0] or "application/octet-stream"
+        with open(audio_file_path, "rb") as audio_file:
+            encoder = MultipartEncoder(fields={
+                "file": (Path(audio_file_path).name, audio_file, mime),
+                "model": "whisper-1",
+                "response_format": "text"
+            })
+            response = self.upload_session.post(
+                url,
+                data=encoder,
+                headers={"Content-Type": encoder.content_type},
+                timeout=600
+            )
+        response.raise_for_status()
+        return response.text
+    
+    def _write_markdown(self, path: str, text: str) -> str:
+        """
+        Write a markdown output (gzipped in compact mode) and return its path
+        """
+        if self.compact:
+            path = f"{path}.gz"
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                f.write(text)
+        else:
+            Path(path).write_text(text, encoding='utf-8')
+        return path
+    
+    def save_transcription(self, transcript: str, original_filename: str, base_path: str, human: str) -> str:
         """
         Save transcription to a timestamped file
         """
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_name = Path(original_filename).stem
-        transcript_filename = f"transcription_{base_name}_{timestamp}.md"
-        transcript_path = self.transcriptions_dir / transcript_filename
-        
-        with open(transcript_path, 'w', encoding='utf-8') as f:
-            f.write(f"# Transcription for {original_filename}\n\n")
-            f.write(f"**Generated:** {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            f.write("## Transcript\n\n")
-            f.write(transcript)
+        transcript_path = self._write_markdown(
+            f"{base_path}_transcription.md",
+            f"# Transcription for {original_filename}\n\n**Generated:** {human}\n\n## Transcript\n\n{transcript}"
+        )
         
         print(f"💾 Transcription saved to: {transcript_path}")
-        return str(transcript_path)
+        return transcript_path
+    
+    def _transcript_context(self, transcript: str) -> List[Dict[str, str]]:
+        """
+        Leading messages of the summary request
+        
+        The long transcript comes before the short task instruction, so a
+        repeated request for the same transcript (e.g. after a prompt tweak)
+        starts with the same token sequence and OpenAI's automatic prompt
+        caching can reuse it (for prefixes of 1024+ tokens).
+        """
+        return [
+            {
+                "role": "system",
+                "content": "You are a professional assistant that summarizes and analyzes speech transcripts."
+            },
+            {
+                "role": "user",
+                "content": f"# Transcript\n\n```\n{transcript}\n```"
+            }
+        ]
     
-    def generate_summary(self, transcript: str) -> str:
+    async def generate_summary(self, transcript: str) -> str:
         """
         Generate summary using GPT
         """
         print("📝 Generating summary...")
         
         try:
-            response = self.client.chat.completions.create(
+            summary = await self._cached_chat(
                 model="gpt-4.1-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional summarizer. Create a concise, well-structured summary that captures the key points, main ideas, and important details from the given transcript. Focus on preserving the core intent and main takeaways."
-                    },
+                messages=self._transcript_context(transcript) + [
                     {
                         "role": "user",
-                        "content": f"Please summarize the following transcript:\n\n{transcript}"
+                        "content": "Create a concise, well-structured summary that captures the key points, main ideas, and important details from the transcript above. Focus on preserving the core intent and main takeaways."
                     }
                 ],
                 max_tokens=1000,
                 temperature=0.3
             )
             
-            summary = response.choices[0].message.content
             print("✅ Summary generated successfully!")
             return summary
             
@@ -101,105 +575,169 @@ class SpeechAnalyzer:
             print(f"❌ Error during summary generation: {str(e)}")
             raise
     
-    def extract_analytics(self, transcript: str) -> Dict[str, Any]:
+    @staticmethod
+    def _count_terms(transcript: str) -> Tuple[int, Counter]:
+        """
+        Count words, and the non-stopword words and two-word phrases that
+        are candidate topics
+        """
+        # Curly apostrophes are folded so "don’t" is one (stop)word
+        tokens = TERM_PATTERN.findall(transcript.lower().replace("\u2019", "'"))
+        # Candidate words, with None where a stopword breaks a phrase
+        words = [
+            None if token in STOPWORDS or len(token) < 2 or not token[0].isalpha() else token
+            for token in tokens
+        ]
+        pairs = Counter(f"{a} {b}" for a, b in zip(words, words[1:]) if a and b)
+        
+        # A phrase seen only once is noise rather than a topic. Each word is
+        # counted once, either in a recurring phrase or on its own, so the
+        # mentions summed over a topic's terms do not count any word twice
+        term_counts = Counter()
+        i = 0
+        while i < len(words):
+            if words[i] is None:
+                i += 1
+                continue
+            phrase = f"{words[i]} {words[i + 1]}" if i + 1 < len(words) and words[i + 1] else None
+            if phrase and pairs[phrase] > 1:
+                term_counts[phrase] += 1
+                i += 2
+            else:
+                term_counts[words[i]] += 1
+                i += 1
+        
+        return len(transcript.split()), term_counts
+    
+    @staticmethod
+    def _parse_topics(content: str, top_terms: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+        """
+        Turn GPT's topic grouping into topics with mention counts
+        
+        Mentions are the locally counted occurrences of each topic's terms.
+        Raises ValueError if the reply is not the requested JSON shape.
+        """
+        analysis = orjson.loads(content) if orjson else json.loads(content)
+        if not isinstance(analysis, dict) or not isinstance(analysis.get("topics"), list):
+            raise ValueError("Topic response does not contain a list of topics")
+        
+        topics = []
+        for topic in analysis["topics"]:
+            if not isinstance(topic, dict) or not isinstance(topic.get("term_ids"), list):
+                continue
+            term_ids = {i for i in topic["term_ids"] if isinstance(i, int) and 0 <= i < len(top_terms)}
+            mentions = sum(top_terms[i][1] for i in term_ids)
+            if mentions:
+                topics.append({"topic": str(topic.get("topic", "")), "mentions": mentions})
+        topics.sort(key=lambda topic: topic["mentions"], reverse=True)
+        return topics
+    
+    async def extract_analytics(self, transcript: str, audio_file_path: str) -> Dict[str, Any]:
         """
         Extract analytics from transcript using GPT
+        
+        Word count, speaking speed and term frequencies are computed
+        locally; GPT only groups the most frequent terms into topics, so
+        the request carries a short term list instead of the transcript.
         """
         print("📊 Extracting analytics...")
         
+        # Read the duration off the event loop while GPT works on the topics
+        loop = asyncio.get_running_loop()
+        duration_future = loop.run_in_executor(None, self._audio_duration_seconds, audio_file_path)
+        
+        # Word count and topic candidates in one pass over the transcript
+        word_count, term_counts = self._count_terms(transcript)
+        
         try:
-            # First, get basic word count
-            words = transcript.split()
-            word_count = len(words)
+            top_terms = term_counts.most_common(TOP_TERMS)
+            candidates = [{"id": i, "term": term, "count": count} for i, (term, count) in enumerate(top_terms)]
             
-            # Use GPT to extract topics and calculate speaking speed
-            response = self.client.chat.completions.create(
+            # Use GPT to group the candidate terms into topics
+            content = await self._cached_chat(
                 model="gpt-4.1-mini",
                 messages=[
                     {
                         "role": "system",
-                        "content": """You are an analytics expert. Analyze the provided transcript and return a JSON object with the following structure:
+                        "content": "You are an analytics expert who identifies the main topics of speech transcripts."
+                    },
+                    {
+                        "role": "user",
+                        "content": """Below are the most frequent terms of a speech transcript with their counts, and an excerpt of the transcript for context. Group the terms into the main themes, subjects, or concepts discussed, putting synonyms and related terms in the same topic. Return at least 3 topics.
+
+Respond with a JSON object with the following structure, referring to terms by their id:
 {
-  "estimated_duration_minutes": <estimate how long this speech likely took in minutes>,
-  "frequently_mentioned_topics": [
-    {"topic": "Topic Name", "mentions": count},
-    {"topic": "Another Topic", "mentions": count}
+  "topics": [
+    {"topic": "Topic Name", "term_ids": [0, 4, 7]}
   ]
 }
 
-For topics, identify the main themes, subjects, or concepts discussed. Count how often each is mentioned (including synonyms and related terms). Return at least 3 topics, ordered by frequency."""
-                    },
-                    {
-                        "role": "user", 
-                        "content": f"Analyze this transcript:\n\n{transcript}"
+""" + json.dumps({"top_terms": candidates, "sample_excerpt": transcript[:EXCERPT_CHARS]}, ensure_ascii=False)
                     }
                 ],
-                max_tokens=800,
+                response_format={"type": "json_object"},
+                max_tokens=600,
                 temperature=0.1
             )
             
-            # Parse the GPT response
-            gpt_analysis = json.loads(response.choices[0].message.content)
-            
-            # Calculate speaking speed
-            estimated_duration = gpt_analysis.get("estimated_duration_minutes", 1)
-            speaking_speed_wpm = round(word_count / estimated_duration) if estimated_duration > 0 else 0
-            
-            analytics = {
-                "word_count": word_count,
-                "speaking_speed_wpm": speaking_speed_wpm,
-                "frequently_mentioned_topics": gpt_analysis.get("frequently_mentioned_topics", [])
-            }
-            
+            topics = self._parse_topics(content, top_terms)
             print("✅ Analytics extracted successfully!")
-            return analytics
             
-        except Exception as e:
+        except (self.api_error, ValueError) as e:
             print(f"❌ Error during analytics extraction: {str(e)}")
-            # Fallback analytics
-            words = transcript.split()
-            return {
-                "word_count": len(words),
-                "speaking_speed_wpm": "Unable to calculate",
-                "frequently_mentioned_topics": [{"topic": "Analysis failed", "mentions": 0}]
-            }
+            # Fallback topics when the API cannot be reached or its reply
+            # is unusable (e.g. JSON cut off by max_tokens)
+            topics = [{"topic": "Analysis failed", "mentions": 0}]
+        
+        # Speaking speed comes from the real audio length, not from GPT, so
+        # it is reported even when the topics fall back
+        duration_seconds = await duration_future
+        speaking_speed_wpm = (
+            round(word_count / (duration_seconds / 60)) if duration_seconds > 0 else "Unable to calculate"
+        )
+        
+        return {
+            "word_count": word_count,
+            "speaking_speed_wpm": speaking_speed_wpm,
+            "frequently_mentioned_topics": topics
+        }
     
-    def save_summary(self, summary: str, original_filename: str) -> str:
+    def save_summary(self, summary: str, original_filename: str, base_path: str, human: str) -> str:
         """
         Save summary to file
         """
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_name = Path(original_filename).stem
-        summary_filename = f"summary_{base_name}_{timestamp}.md"
-        summary_path = self.transcriptions_dir / summary_filename
-        
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            f.write(f"# Summary for {original_filename}\n\n")
-            f.write(f"**Generated:** {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            f.write("## Summary\n\n")
-            f.write(summary)
+        summary_path = self._write_markdown(
+            f"{base_path}_summary.md",
+            f"# Summary for {original_filename}\n\n**Generated:** {human}\n\n## Summary\n\n{summary}"
+        )
         
         print(f"💾 Summary saved to: {summary_path}")
-        return str(summary_path)
+        return summary_path
     
-    def save_analytics(self, analytics: Dict[str, Any], original_filename: str) -> str:
+    def save_analytics(self, analytics: Dict[str, Any], original_filename: str, base_path: str, human: str) -> str:
         """
         Save analytics to JSON file
         """
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_name = Path(original_filename).stem
-        analytics_filename = f"analysis_{base_name}_{timestamp}.json"
-        analytics_path = self.transcriptions_dir / analytics_filename
+        analytics_path = f"{base_path}_analytics.json"
         
-        with open(analytics_path, 'w', encoding='utf-8') as f:
-            json.dump(analytics, f, indent=2)
+        if orjson is not None:
+            # orjson output is compact unless indentation is requested
+            option = 0 if self.compact else orjson.OPT_INDENT_2
+            Path(analytics_path).write_bytes(orjson.dumps(analytics, option=option))
+        elif self.compact:
+            Path(analytics_path).write_text(json.dumps(analytics, separators=(",", ":")), encoding='utf-8')
+        else:
+            Path(analytics_path).write_text(json.dumps(analytics, indent=2), encoding='utf-8')
         
         print(f"💾 Analytics saved to: {analytics_path}")
-        return str(analytics_path)
+        return analytics_path
     
-    def process_audio(self, audio_file_path: str) -> Dict[str, Any]:
+    async def process_audio_async(self, audio_file_path: str) -> Dict[str, Any]:
         """
         Complete pipeline: transcribe, summarize, and analyze audio
+        
+        Summary and analytics only depend on the transcript, so both GPT
+        calls (and the transcript file write) run concurrently.
         """
         if not os.path.exists(audio_file_path):
             raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
@@ -207,17 +745,39 @@ For topics, identify the main themes, subjects, or concepts discussed. Count how
         print(f"\n🚀 Starting processing for: {audio_file_path}")
         print("=" * 50)
         
-        # Step 1: Transcribe
-        transcript = self.transcribe_audio(audio_file_path)
-        transcript_path = self.save_transcription(transcript, audio_file_path)
+        loop = asyncio.get_running_loop()
         
-        # Step 2: Summarize
-        summary = self.generate_summary(transcript)
-        summary_path = self.save_summary(summary, audio_file_path)
+        # One timestamp and output name prefix for the run, shared by the
+        # three output files
+        now = datetime.datetime.now()
+        base_path = str(self.transcriptions_dir / f"{Path(audio_file_path).stem}_{now.strftime('%Y%m%d_%H%M%S')}")
+        suffix = 2
+        unique_path = base_path
+        while unique_path in self._output_prefixes:
+            unique_path = f"{base_path}_{suffix}"
+            suffix += 1
+        base_path = unique_path
+        self._output_prefixes.add(base_path)
+        human = now.strftime("%Y-%m-%d %H:%M:%S")
         
-        # Step 3: Analyze
-        analytics = self.extract_analytics(transcript)
-        analytics_path = self.save_analytics(analytics, audio_file_path)
+        # One client session for all of the file's API calls
+        async with self.session():
+            # Step 1: Transcribe (a smaller transcoded copy when possible)
+            upload_path = await loop.run_in_executor(None, self._maybe_transcode, audio_file_path)
+            transcript = await self.transcribe_audio(upload_path)
+            
+            # Step 2: Summarize and analyze concurrently
+            transcript_path, summary, analytics = await asyncio.gather(
+                loop.run_in_executor(None, self.save_transcription, transcript, audio_file_path, base_path, human),
+                self.generate_summary(transcript),
+                self.extract_analytics(transcript, audio_file_path)
+            )
+            
+            # Step 3: Save the results
+            summary_path, analytics_path = await asyncio.gather(
+                loop.run_in_executor(None, self.save_summary, summary, audio_file_path, base_path, human),
+                loop.run_in_executor(None, self.save_analytics, analytics, audio_file_path, base_path, human)
+            )
         
         # Return results
         results = {
@@ -232,6 +792,37 @@ For topics, identify the main themes, subjects, or concepts discussed. Count how
         }
         
         return results
+    
+    def process_audio(self, audio_file_path: str) -> Dict[str, Any]:
+        """
+        Synchronous entry point for the processing pipeline
+        """
+        return asyncio.run(self.process_audio_async(audio_file_path))
+    
+    async def process_many(
+        self, audio_file_paths: List[str], max_concurrency: int = 8
+    ) -> AsyncIterator[Tuple[str, Union[Dict[str, Any], Exception]]]:
+        """
+        Process several audio files concurrently
+        
+        At most max_concurrency files are in flight at once, sharing one
+        client session. (path, results) pairs are yielded as soon as each
+        file finishes, so one slow file does not hold back the others; a
+        failed file yields its exception instead of results.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def process_one(path: str) -> Tuple[str, Union[Dict[str, Any], Exception]]:
+            async with semaphore:
+                try:
+                    return path, await self.process_audio_async(path)
+                except Exception as e:
+                    return path, e
+        
+        async with self.session():
+            for finished in asyncio.as_completed([process_one(path) for path in audio_file_paths]):
+                yield await finished
+
 
 def display_results(results: Dict[str, Any]):
     """
@@ -262,6 +853,20 @@ def display_results(results: Dict[str, Any]):
     
     print("\n✨ All done! Check the 'transcriptions' folder for your files.")
 
+async def process_files(analyzer: SpeechAnalyzer, audio_file_paths: List[str], concurrency: int):
+    """
+    Process all audio files and display each result as soon as it is ready
+    """
+    async for path, outcome in analyzer.process_many(audio_file_paths, concurrency):
+        if isinstance(outcome, FileNotFoundError):
+            print(f"❌ Error: {outcome}")
+            print("Please check that the audio file path is correct.")
+        elif isinstance(outcome, Exception):
+            print(f"❌ Error processing {path}: {outcome}")
+            print("Please check your internet connection and try again.")
+        else:
+            display_results(outcome)
+
 def main():
     """
     Main application entry point
@@ -274,31 +879,96 @@ Examples:
   python main.py audio.wav
   python main.py /path/to/audio.mp3
   python main.py recording.m4a
+  python main.py first.mp3 second.wav --concurrency 4
+  python main.py --glob "recordings/*.mp3"
 
 Supported audio formats: mp3, mp4, mpeg, mpga, m4a, wav, webm
         """
     )
     
     parser.add_argument(
-        "audio_file",
-        help="Path to the audio file to process"
+        "audio_files",
+        nargs="*",
+        metavar="audio_file",
+        help="Path(s) to the audio file(s) to process"
+    )
+    parser.add_argument(
+        "--glob",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="Glob pattern of audio files to process (e.g. 'recordings/*.mp3'); may be repeated"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        metavar="N",
+        help="Maximum number of files processed at once (default: 8)"
+    )
+    parser.add_argument(
+        "--rpm",
+        type=int,
+        default=60,
+        metavar="N",
+        help="Maximum GPT requests per minute (default: 60)"
+    )
+    parser.add_argument(
+        "--whisper-rpm",
+        type=int,
+        default=50,
+        metavar="N",
+        help="Maximum Whisper requests per minute (default: 50)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore cached GPT responses (fresh responses are still cached)"
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write minified analytics JSON and gzip the transcription and summary files"
+    )
+    parser.add_argument(
+        "--no-transcode",
+        action="store_true",
+        help="Upload audio files as is instead of converting them to 16kHz mono Opus"
     )
     
     args = parser.parse_args()
     
+    audio_file_paths = []
+    seen = set()
+    for path in list(args.audio_files) + [match for pattern in args.glob for match in sorted(glob.glob(pattern))]:
+        # A file named directly and matched by --glob is processed once
+        real_path = os.path.realpath(path)
+        if real_path not in seen:
+            seen.add(real_path)
+            audio_file_paths.append(path)
+    if not audio_file_paths:
+        parser.error("no audio files given")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.rpm < 1 or args.whisper_rpm < 1:
+        parser.error("--rpm and --whisper-rpm must be at least 1")
+    missing = [path for path in audio_file_paths if not os.path.exists(path)]
+    if missing:
+        parser.error(f"audio file not found: {', '.join(missing)}")
+    
     try:
         # Initialize the analyzer
-        analyzer = SpeechAnalyzer()
-        
-        # Process the audio file
-        results = analyzer.process_audio(args.audio_file)
+        analyzer = SpeechAnalyzer(
+            use_cache=not args.no_cache,
+            transcode=not args.no_transcode,
+            rpm=args.rpm,
+            whisper_rpm=args.whisper_rpm,
+            compact=args.compact
+        )
         
-        # Display results
-        display_results(results)
+        # Process the audio files and display results as they complete
+        asyncio.run(process_files(analyzer, audio_file_paths, args.concurrency))
         
-    except FileNotFoundError as e:
-        print(f"❌ Error: {e}")
-        print("Please check that the audio file path is correct.")
     except ValueError as e:
         print(f"❌ Configuration Error: {e}")
         print("Please check your .env file and OpenAI API key.")
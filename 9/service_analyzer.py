@@ -12,51 +12,33 @@ Usage:
 """
 
 import argparse
+import logging
 import os
 import sys
 from typing import Optional
-import openai
-from dotenv import load_dotenv
+from tenacity import before_sleep_log, retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-class ServiceAnalyzer:
-    """Main class for analyzing services and generating reports."""
-    
-    def __init__(self):
-        """Initialize the analyzer with OpenAI client."""
-        self.api_key = os.getenv('OPENAI_API_KEY')
-        if not self.api_key:
-            print("❌ Error: OPENAI_API_KEY environment variable not found.")
-            print("Please set your OpenAI API key in a .env file or environment variable.")
-            sys.exit(1)
-        
-        openai.api_key = self.api_key
-        self.client = openai.OpenAI(api_key=self.api_key)
-    
-    def create_analysis_prompt(self, input_text: str, is_service_name: bool) -> str:
-        """Create a comprehensive prompt for service analysis."""
-        
-        base_prompt = """You are an expert business analyst specializing in digital services and products. 
+# Prompt pieces are static apart from the input text, so they are built once
+_BASE_PROMPT = """You are an expert business analyst specializing in digital services and products. 
 Your task is to create a comprehensive, well-researched analysis report in markdown format.
 
 """
-        
-        if is_service_name:
-            specific_prompt = f"""Please analyze the service/product: "{input_text}"
+
+_SERVICE_PROMPT_TEMPLATE = """Please analyze the service/product: "{input_text}"
 
 Use your knowledge about this service to provide accurate information. If you're not familiar with the service, clearly state what information is limited or unavailable.
 """
-        else:
-            specific_prompt = f"""Please analyze the following service/product description:
+
+_TEXT_PROMPT_TEMPLATE = """Please analyze the following service/product description:
 
 "{input_text}"
 
 Extract and analyze all available information from the provided text, and use your knowledge to fill in gaps where appropriate.
 """
-        
-        format_requirements = """
+
+_FORMAT_REQUIREMENTS = """
 IMPORTANT: Your response must be a well-formatted markdown report with exactly these sections in this order:
 
 # Service Analysis Report
@@ -96,8 +78,53 @@ Requirements:
 - Keep each section focused and informative
 - Aim for comprehensive coverage while being concise
 """
+
+class ServiceAnalyzer:
+    """Main class for analyzing services and generating reports."""
+    
+    def __init__(self):
+        """Initialize the analyzer with OpenAI client."""
+        # Imported here so --help and argument errors skip the slow imports
+        import openai
+        from dotenv import load_dotenv
         
-        return base_prompt + specific_prompt + format_requirements
+        # Load environment variables
+        load_dotenv()
+        
+        self.api_key = os.getenv('OPENAI_API_KEY')
+        if not self.api_key:
+            print("❌ Error: OPENAI_API_KEY environment variable not found.")
+            print("Please set your OpenAI API key in a .env file or environment variable.")
+            sys.exit(1)
+        
+        # A single request per run, so the SDK's default HTTP client suffices;
+        # its own retries are off because retry_policy handles them
+        self.client = openai.OpenAI(api_key=self.api_key, max_retries=0)
+        
+        # Retry rate-limited, timed-out and server-failed requests with exponential backoff
+        self.retry_policy = retry(
+            retry=retry_if_exception_type((openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)),
+            wait=wait_random_exponential(min=1, max=30),
+            stop=stop_after_attempt(6),
+            before_sleep=before_sleep_log(logger, logging.WARNING),
+            reraise=True
+        )
+    
+    def close(self) -> None:
+        """Close the OpenAI client's HTTP connections."""
+        self.client.close()
+    
+    def __enter__(self) -> "ServiceAnalyzer":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def create_analysis_prompt(self, input_text: str, is_service_name: bool) -> str:
+        """Create a comprehensive prompt for service analysis."""
+        
+        template = _SERVICE_PROMPT_TEMPLATE if is_service_name else _TEXT_PROMPT_TEMPLATE
+        return _BASE_PROMPT + template.format(input_text=input_text) + _FORMAT_REQUIREMENTS
     
     def analyze_service(self, input_text: str, is_service_name: bool = True) -> str:
         """Analyze a service and return a comprehensive markdown report."""
@@ -107,7 +134,7 @@ Requirements:
             
             print("🔍 Analyzing service... This may take a moment.")
             
-            response = self.client.chat.completions.create(
+            response = self.retry_policy(self.client.chat.completions.create)(
                 model="gpt-4.1-mini",
                 messages=[
                     {
@@ -177,31 +204,31 @@ Examples:
     args = parser.parse_args()
     
     # Initialize analyzer
-    analyzer = ServiceAnalyzer()
-    
-    # Determine input type and content
-    if args.service:
-        input_text = args.service
-        is_service_name = True
-        print(f"📊 Analyzing service: {input_text}")
-    else:
-        input_text = args.text
-        is_service_name = False
-        print(f"📊 Analyzing provided text (first 100 chars): {input_text[:100]}...")
-    
-    # Generate analysis
-    report = analyzer.analyze_service(input_text, is_service_name)
-    
-    # Output results
-    if args.output:
-        saved_file = analyzer.save_report(report, args.output)
-        if saved_file:
-            print(f"✅ Report saved to: {saved_file}")
-        print(f"\n📋 Report preview:\n{'-' * 50}")
-        print(report[:500] + "..." if len(report) > 500 else report)
-    else:
-        print(f"\n📋 Analysis Report:\n{'-' * 50}")
-        print(report)
+    with ServiceAnalyzer() as analyzer:
+        
+        # Determine input type and content
+        if args.service:
+            input_text = args.service
+            is_service_name = True
+            print(f"📊 Analyzing service: {input_text}")
+        else:
+            input_text = args.text
+            is_service_name = False
+            print(f"📊 Analyzing provided text (first 100 chars): {input_text[:100]}...")
+        
+        # Generate analysis
+        report = analyzer.analyze_service(input_text, is_service_name)
+        
+        # Output results
+        if args.output:
+            saved_file = analyzer.save_report(report, args.output)
+            if saved_file:
+                print(f"✅ Report saved to: {saved_file}")
+            print(f"\n📋 Report preview:\n{'-' * 50}")
+            print(report[:500] + "..." if len(report) > 500 else report)
+        else:
+            print(f"\n📋 Analysis Report:\n{'-' * 50}")
+            print(report)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -59,6 +59,14 @@ def test_imports():
         print("   Make sure to run: pip install -r requirements.txt")
         return False
     
+    try:
+        import tenacity
+        print("✅ tenacity imported successfully")
+    except ImportError as e:
+        print(f"❌ Failed to import tenacity: {e}")
+        print("   Make sure to run: pip install -r requirements.txt")
+        return False
+    
     return True
 
 def test_script_syntax():